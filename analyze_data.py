@@ -3,10 +3,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
-
-# Отключаем UserWarning от matplotlib, который вы видели ранее
 import warnings
-warnings.filterwarnings("ignore", category=UserWarning)
 
 
 def analyze_divergence_data(filepath='live_divergence_data.json'):
@@ -69,4 +66,7 @@ def analyze_divergence_data(filepath='live_divergence_data.json'):
     print(f"\nАнализ завершен. Гистограмма сохранена в файл: {output_filename}")
 
 if __name__ == '__main__':
+    # Отключаем UserWarning от matplotlib, который вы видели ранее.
+    # Только при запуске скрипта: импорт модуля не должен менять глобальные фильтры
+    warnings.filterwarnings("ignore", category=UserWarning)
     analyze_divergence_data()
@@ -1,11 +1,14 @@
 from typing import Dict, Optional, List
+from concurrent.futures import ThreadPoolExecutor
 import json
 import logging
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
 from datetime import datetime
 import os
+import time
+
+# Если возможность видна повторно раньше, чем через столько секунд после прошлого
+# появления, это та же самая возможность, а не новая
+OPPORTUNITY_TTL = 5
 
 class TriangularArbitrageStrategy:
     """
@@ -29,9 +32,13 @@ class TriangularArbitrageStrategy:
 
         # Словарь для хранения самых свежих рыночных данных (стаканов)
         self.market_data = {symbol: {'bids': [], 'asks': []} for symbol in self.symbols}
+        # Потоки для одновременной загрузки стаканов: по одному на символ
+        self._fetch_executor = ThreadPoolExecutor(max_workers=len(self.symbols))
         
         # Комиссии для каждой пары
         self.fees = {symbol: self.fee_rate for symbol in self.symbols}
+        # Суммарная комиссия за три сделки цепочки (в %) не меняется - считаем один раз
+        self.total_fee_pct = (1 - (1 - self.fee_rate)**3) * 100
 
         # Определяем возможные арбитражные пути
         # Убедитесь, что эти пути соответствуют символам в вашем config.py
@@ -43,23 +50,44 @@ class TriangularArbitrageStrategy:
         }
         
         # Список для сбора данных о расхождениях с временными метками
-        self.divergence_data = []  # Будет содержать кортежи (timestamp, profit_percentage)
+        # Кортежи (time.time(), profit_percentage); в datetime переводим только при сохранении
+        self.divergence_data = []
 
         # --- Статистика сессии ---
         self.start_time = datetime.now()
         self.initial_balance = self.position_size
         self.current_balance = self.position_size
-        self.trade_log = [] # Будет хранить {'gross_profit_pct': ..., 'net_profit_pct': ...}
+        # Для отчета нужны только счетчики сделок, сами сделки уже записаны в trade_logger
+        self.total_trades = 0
+        self.profitable_trades = 0
+        self._last_opportunity_seen = None # time.monotonic() последнего появления возможности
         
         print("Экземпляр стратегии создан. Готов к приему данных.")
 
+    def fetch_order_books(self, limit: int):
+        """
+        Загружает стаканы всех символов одновременно и обновляет market_data.
+        Время цикла - самый медленный запрос, а не сумма всех. Ошибка любого
+        запроса (ccxt.NetworkError и т.д.) пробрасывается вызывающему.
+        """
+        # Темп задает COLLECTOR_INTERVAL цикла; ограничитель ccxt (enableRateLimit)
+        # выстроил бы эти параллельные запросы в очередь, поэтому он выключен
+        futures = [(symbol, self._fetch_executor.submit(self.exchange.fetch_order_book, symbol, limit=limit))
+                   for symbol in self.symbols]
+        for symbol, future in futures:
+            self.update_market_data(symbol, future.result())
+
+    def close(self):
+        """Останавливает потоки загрузки стаканов; незапущенные запросы отменяются."""
+        self._fetch_executor.shutdown(wait=True, cancel_futures=True)
+
     def update_market_data(self, symbol: str, market_data: Dict[str, list]):
         """Обновляет данные стакана для указанного символа."""
         if 'bids' in market_data and 'asks' in market_data:
-            self.market_data[symbol] = {
-                'bids': market_data['bids'], # [[price, volume], ...]
-                'asks': market_data['asks'], # [[price, volume], ...]
-            }
+            # Обновляем существующий словарь на месте, не создавая новый на каждое обновление
+            book = self.market_data.setdefault(symbol, {})
+            book['bids'] = market_data['bids'] # [[price, volume], ...]
+            book['asks'] = market_data['asks'] # [[price, volume], ...]
 
     def _calculate_price_impact(self, order_book_side: list, amount_to_process: float, is_buy: bool) -> tuple:
         """
@@ -108,50 +136,80 @@ class TriangularArbitrageStrategy:
         Рассчитывает арбитражную возможность с учетом глубины стакана.
         """
         s1, s2, s3 = self.symbols # BTC/USDT, LTC/USDT, LTC/BTC
+        # Берем стаканы один раз, чтобы не повторять поиск по словарю на каждом шаге
+        book1 = self.market_data[s1]
+        book2 = self.market_data[s2]
+        book3 = self.market_data[s3]
 
-        if not all(self.market_data[s]['bids'] and self.market_data[s]['asks'] for s in self.symbols):
+        if not (book1['bids'] and book1['asks'] and book2['bids'] and book2['asks']
+                and book3['bids'] and book3['asks']):
             return 0 # Не все данные по стаканам еще доступны
 
-        # --- Цепочка 1: USDT -> BTC -> LTC -> USDT ---
-        # 1. Покупаем BTC за USDT (используем asks BTC/USDT)
-        price1, btc_amount, can_exec1 = self._calculate_price_impact(self.market_data[s1]['asks'], self.position_size, is_buy=True)
-        if not can_exec1:
-            return 0
-        
-        # 2. Продаем BTC, покупаем LTC (используем asks LTC/BTC, т.к. мы покупаем LTC)
-        # Здесь мы продаем btc_amount, поэтому is_buy=False не совсем верно. Логика сложнее.
-        # Правильно: нам нужно купить LTC на сумму btc_amount. Это эквивалентно продаже BTC.
-        # Для пары LTC/BTC, покупая LTC, мы тратим BTC. Это операция покупки.
-        price2, ltc_amount, can_exec2 = self._calculate_price_impact(self.market_data[s3]['asks'], btc_amount, is_buy=True)
-        if not can_exec2:
-             return 0
-
-        # 3. Продаем LTC за USDT (используем bids LTC/USDT)
-        price3, final_usdt_amount, can_exec3 = self._calculate_price_impact(self.market_data[s2]['bids'], ltc_amount, is_buy=False)
-        if not can_exec3:
-            return 0
-
-        profit_percentage = ((final_usdt_amount - self.position_size) / self.position_size) * 100
-
-        # TODO: Добавить вторую цепочку (USDT -> LTC -> BTC -> USDT)
+        # Считаем обе цепочки и берем лучшую: в зависимости от рынка
+        # выгодным может оказаться любое направление обхода треугольника
+        profits = []
 
-        return profit_percentage
+        # --- Цепочка 1: USDT -> BTC -> LTC -> USDT ---
+        profit1 = self._simulate_chain((
+            (book1['asks'], True),  # 1. Покупаем BTC за USDT (используем asks BTC/USDT)
+            (book3['asks'], True),  # 2. Тратим BTC на покупку LTC (asks LTC/BTC) - это операция покупки
+            (book2['bids'], False), # 3. Продаем LTC за USDT (используем bids LTC/USDT)
+        ))
+        if profit1 is not None:
+            profits.append(profit1)
+
+        # --- Цепочка 2: USDT -> LTC -> BTC -> USDT ---
+        profit2 = self._simulate_chain((
+            (book2['asks'], True),  # 1. Покупаем LTC за USDT (используем asks LTC/USDT)
+            (book3['bids'], False), # 2. Продаем LTC за BTC (используем bids LTC/BTC)
+            (book1['bids'], False), # 3. Продаем BTC за USDT (используем bids BTC/USDT)
+        ))
+        if profit2 is not None:
+            profits.append(profit2)
+
+        if not profits:
+            return 0 # Ни одну цепочку не исполнить на текущей ликвидности
+        return max(profits)
+
+    def _simulate_chain(self, legs) -> Optional[float]:
+        """
+        Прогоняет position_size через цепочку сделок по стаканам.
+        legs: последовательность (сторона_стакана, is_buy) для каждой сделки.
+        Возвращает прибыль в % до комиссий или None, если не хватило ликвидности.
+        """
+        amount = self.position_size
+        for order_book_side, is_buy in legs:
+            _, amount, can_exec = self._calculate_price_impact(order_book_side, amount, is_buy=is_buy)
+            if not can_exec:
+                return None
+        return ((amount - self.position_size) / self.position_size) * 100
+
+    def is_new_opportunity(self) -> bool:
+        """
+        Отмечает, что возможность видна сейчас, и возвращает True, только если она новая.
+        Одно расхождение держится несколько циклов подряд - без этой проверки
+        каждый цикл засчитывался бы как отдельная сделка.
+        """
+        now = time.monotonic()
+        last_seen = self._last_opportunity_seen
+        self._last_opportunity_seen = now
+        return last_seen is None or now - last_seen > OPPORTUNITY_TTL
 
     def log_paper_trade(self, gross_profit_pct):
         """Логирует симулированную сделку и обновляет статистику."""
-        total_fee_pct = (1 - (1 - self.fee_rate)**3) * 100
-        net_profit_pct = gross_profit_pct - total_fee_pct
+        net_profit_pct = gross_profit_pct - self.total_fee_pct
 
-        self.trade_log.append({
-            'gross_profit_pct': gross_profit_pct,
-            'net_profit_pct': net_profit_pct
-        })
+        self.total_trades += 1
+        if net_profit_pct > 0:
+            self.profitable_trades += 1
 
         # Обновляем баланс
         self.current_balance *= (1 + net_profit_pct / 100)
 
         # Логируем в файл
-        self.trade_logger.info(f"PAPER_TRADE; GROSS: {gross_profit_pct:+.4f}%; NET: {net_profit_pct:+.4f}%; BALANCE: ${self.current_balance:.2f}")
+        # Ленивое %-форматирование: строка собирается, только если запись реально пишется
+        self.trade_logger.info("PAPER_TRADE; GROSS: %+.4f%%; NET: %+.4f%%; BALANCE: $%.2f",
+                               gross_profit_pct, net_profit_pct, self.current_balance)
         return net_profit_pct > 0
 
     def save_divergence_data(self):
@@ -165,13 +223,14 @@ class TriangularArbitrageStrategy:
         stats_dir = os.path.join('statistics', exchange_name_lower)
         os.makedirs(stats_dir, exist_ok=True)
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Одна отметка времени и для имени файла, и для длительности сессии
+        end_time = datetime.now()
+        timestamp = end_time.strftime("%Y%m%d_%H%M%S")
 
         # 2. Подготавливаем данные для сохранения
-        data_to_save = [{'timestamp': ts.isoformat(), 'profit_percentage': profit}
-                        for ts, profit in self.divergence_data]
-        timestamps = [ts for ts, _ in self.divergence_data]
-        profits = [profit for _, profit in self.divergence_data]
+        timestamps = [datetime.fromtimestamp(ts) for ts, _ in self.divergence_data]
+        data_to_save = [{'timestamp': dt.isoformat(), 'profit_percentage': profit}
+                        for dt, (_, profit) in zip(timestamps, self.divergence_data)]
 
         # 3. Сохраняем данные в JSON
         json_filename = os.path.join(stats_dir, f'{exchange_name_lower}_data_{timestamp}.json')
@@ -180,10 +239,9 @@ class TriangularArbitrageStrategy:
         logging.info(f"Divergence data saved to {json_filename}")
 
         # 3. Рассчитываем итоговую статистику для отчета
-        end_time = datetime.now()
         duration = end_time - self.start_time
-        total_trades = len(self.trade_log)
-        profitable_trades = sum(1 for trade in self.trade_log if trade['net_profit_pct'] > 0)
+        total_trades = self.total_trades
+        profitable_trades = self.profitable_trades
         unprofitable_trades = total_trades - profitable_trades
         win_rate = (profitable_trades / total_trades * 100) if total_trades > 0 else 0
         net_pnl = self.current_balance - self.initial_balance
@@ -209,6 +267,17 @@ class TriangularArbitrageStrategy:
 
         # 4. Создаем графики и отчет
         try:
+            # Библиотеки для графиков грузим только здесь: они не нужны на старте бота,
+            # а ошибка импорта должна стоить только графика - JSON выше уже сохранен
+            import numpy as np
+            import pandas as pd
+            import matplotlib.pyplot as plt
+
+            # Прибыль держим в массиве NumPy: среднее и раскраска считаются векторно
+            profits = np.fromiter((profit for _, profit in self.divergence_data),
+                                  dtype=float, count=len(self.divergence_data))
+            mean_profit = profits.mean()
+
             # Используем GridSpec для сложного макета: текстовый блок сверху, графики снизу
             fig = plt.figure(figsize=(15, 12))
             gs = fig.add_gridspec(3, 1, height_ratios=[1, 2, 2])
@@ -225,8 +294,8 @@ class TriangularArbitrageStrategy:
             
             # График 1: Временной столбчатый график
             if timestamps:
-                # Создаем цвета для столбцов
-                colors = ['green' if p > 0 else 'red' if p < -0.1 else 'orange' for p in profits]
+                # Цвета для столбцов: одна векторная классификация вместо ветвлений на каждую точку
+                colors = np.select([profits > 0, profits < -0.1], ['green', 'red'], default='orange')
                 
                 # Вычисляем ширину столбцов на основе интервала
                 if len(timestamps) > 1:
@@ -239,8 +308,8 @@ class TriangularArbitrageStrategy:
                        edgecolor='black', linewidth=0.1)
                 
                 ax1.axhline(y=0, color='black', linestyle='-', linewidth=2, label='Breakeven (0%)')
-                ax1.axhline(y=np.mean(profits), color='blue', linestyle='--', linewidth=2, 
-                          label=f'Mean Profit: {np.mean(profits):.4f}%')
+                ax1.axhline(y=mean_profit, color='blue', linestyle='--', linewidth=2, 
+                          label=f'Mean Profit: {mean_profit:.4f}%')
                 
                 # Устанавливаем фиксированную шкалу Y
                 ax1.set_ylim(-0.20, 0.20)
@@ -271,8 +340,8 @@ class TriangularArbitrageStrategy:
             # График 2: Гистограмма распределения
             ax2.hist(profits, bins=100, alpha=0.75, color='royalblue')
             ax2.axvline(x=0, color='red', linestyle='--', linewidth=1.5, label='Breakeven')
-            ax2.axvline(x=np.mean(profits), color='green', linestyle='-', linewidth=2, 
-                       label=f'Mean Profit: {np.mean(profits):.4f}%')
+            ax2.axvline(x=mean_profit, color='green', linestyle='-', linewidth=2, 
+                       label=f'Mean Profit: {mean_profit:.4f}%')
             ax2.set_title('Distribution of Arbitrage Opportunities')
             ax2.set_xlabel('Profit Percentage (%)')
             ax2.set_ylabel('Frequency')
@@ -10,6 +10,10 @@ import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
 
+# Шаблоны разбора строк лога компилируются один раз, а не на каждой строке
+PROFIT_RE = re.compile(r'Net profit: ([+-]?\d+\.?\d*)%')
+TIMESTAMP_RE = re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})')
+
 def analyze_exchange_logs(log_directory, exchange_name):
     """Анализирует логи одной биржи"""
     results = {
@@ -39,7 +43,7 @@ def analyze_exchange_logs(log_directory, exchange_name):
                     results['total_trades'] += 1
                     
                     # Извлекаем прибыль
-                    profit_match = re.search(r'Net profit: ([+-]?\d+\.?\d*)%', line)
+                    profit_match = PROFIT_RE.search(line)
                     if profit_match:
                         profit_pct = float(profit_match.group(1))
                         profit_usd = (profit_pct / 100) * 15  # Предполагаем $15 позицию
@@ -52,7 +56,7 @@ def analyze_exchange_logs(log_directory, exchange_name):
                             results['failed_trades'] += 1
                     
                     # Извлекаем временную метку
-                    timestamp_match = re.search(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
+                    timestamp_match = TIMESTAMP_RE.search(line)
                     if timestamp_match:
                         results['timestamps'].append(timestamp_match.group(1))
     
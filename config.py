@@ -17,6 +17,8 @@ FEE_RATE = 0.00075
 BOT_MODE = 'paper_trader'  # Измените на 'scanner' для простого сбора статистики
 POSITION_SIZE = 15  # Размер позиции в USDT
 COLLECTOR_INTERVAL = 1  # Интервал между запросами к API в секундах
+NETWORK_RETRY_DELAY = 5  # Начальная пауза после сетевой ошибки (сек), удваивается при повторах
+MAX_NETWORK_RETRY_DELAY = 60  # Максимальная пауза после серии сетевых ошибок (сек)
 
 # Торговые пары
 # Формат CCXT: 'BASE/QUOTE'
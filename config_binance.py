@@ -7,6 +7,8 @@ API_CONFIG = {
     'options': {
         'defaultType': 'spot',
     },
+    # Встроенный ограничитель запросов ccxt выключен
+    'enableRateLimit': False,
 }
 
 # 2. Настройки комиссии (Binance с BNB)
@@ -26,6 +28,10 @@ POSITION_SIZE = 11  # Рекомендуется > 10 USDT
 # Интервал опроса данных (в секундах)
 COLLECTOR_INTERVAL = 2
 
+# Пауза после сетевой ошибки (в секундах): удваивается при повторах, но не больше максимума
+NETWORK_RETRY_DELAY = 5
+MAX_NETWORK_RETRY_DELAY = 60
+
 # 4. Торговые пары (Символы)
 # Пример для Binance
 SYMBOLS = [
@@ -11,6 +11,7 @@ import base64
 from huobi.client.market import MarketClient
 from huobi.client.trade import TradeClient
 from huobi.client.generic import GenericClient
+from huobi.client.account import AccountClient
 from huobi.constant import *
 from huobi.exception.huobi_api_exception import HuobiApiException
 
@@ -27,6 +28,13 @@ class HtxApi:
         self.market_client = MarketClient(api_key=self.api_key, secret_key=self.secret_key, url=base_url)
         self.trade_client = TradeClient(api_key=self.api_key, secret_key=self.secret_key, url=base_url)
         self.generic_client = GenericClient(api_key=self.api_key, secret_key=self.secret_key, url=base_url)
+        self.account_client = AccountClient(api_key=self.api_key, secret_key=self.secret_key, url=base_url)
+        self._spot_account_id = None # Кэш ID спотового аккаунта: он не меняется, запрашиваем один раз
+        # Одна HTTP-сессия на все подписанные запросы: соединение с биржей переиспользуется (keep-alive)
+        self.session = requests.Session()
+        # Ключ HMAC готовится при первом подписанном запросе и затем только копируется:
+        # для клиента без secret_key (только рыночные данные) он не нужен
+        self._signer = None
         self.logger = logging.getLogger(__name__)
 
     def get_market_data(self, symbols: List[str]) -> Optional[Dict]:
@@ -109,7 +117,11 @@ class HtxApi:
         payload = [method, host, path, encode_params]
         payload_str = '\n'.join(payload)
 
-        signature = hmac.new(self.secret_key.encode('utf-8'), payload_str.encode('utf-8'), hashlib.sha256).digest()
+        if self._signer is None:
+            self._signer = hmac.new(self.secret_key.encode('utf-8'), digestmod=hashlib.sha256)
+        signer = self._signer.copy()
+        signer.update(payload_str.encode('utf-8'))
+        signature = signer.digest()
         signature_b64 = base64.b64encode(signature).decode()
 
         params['Signature'] = signature_b64
@@ -117,7 +129,7 @@ class HtxApi:
         url = f"{self.base_url}{path}?{urllib.parse.urlencode(params)}"
 
         try:
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
             if data.get('code') == 200 and data.get('data'):
@@ -192,14 +204,15 @@ class HtxApi:
             return None
 
     def _get_spot_account_id(self) -> Optional[int]:
-        """Получает ID спотового аккаунта."""
+        """Получает ID спотового аккаунта (запрос к API только при первом вызове)."""
+        if self._spot_account_id is not None:
+            return self._spot_account_id
         try:
-            from huobi.client.account import AccountClient
-            account_client = AccountClient(api_key=self.api_key, secret_key=self.secret_key, url=self.base_url)
-            list_obj = account_client.get_accounts()
+            list_obj = self.account_client.get_accounts()
             if list_obj and list_obj.data:
                 for account in list_obj.data:
                     if account.type == "spot":
+                        self._spot_account_id = account.id
                         return account.id
             self.logger.error("Не удалось найти спотовый аккаунт.")
             return None
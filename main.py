@@ -1,14 +1,15 @@
 import ccxt
 import time
 import logging
-import json
-import pandas as pd
-import matplotlib.pyplot as plt
+import logging.handlers
+import queue
+import atexit
 from datetime import datetime
 import os
 
 from arbitrage_strategy import TriangularArbitrageStrategy
-from config import SYMBOLS, MIN_PROFIT_THRESHOLD, POSITION_SIZE, FEE_RATE, COLLECTOR_INTERVAL, BOT_MODE, API_KEY, SECRET_KEY
+from config import (SYMBOLS, MIN_PROFIT_THRESHOLD, POSITION_SIZE, FEE_RATE, COLLECTOR_INTERVAL, BOT_MODE, API_KEY, SECRET_KEY,
+                    NETWORK_RETRY_DELAY, MAX_NETWORK_RETRY_DELAY)
 
 def setup_loggers():
     """Настраивает основной логгер для консоли и отдельный логгер для записи сделок в файл."""
@@ -28,7 +29,13 @@ def setup_loggers():
     
     file_handler = logging.FileHandler(filename)
     file_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
-    trade_logger.addHandler(file_handler)
+
+    # Запись на диск идет в отдельном потоке, чтобы цикл опроса не ждал файловый ввод-вывод
+    log_queue = queue.Queue()
+    trade_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop) # Дописывает очередь в файл при выходе
     
     logging.info(f"Trade results will be saved to {filename}")
     return trade_logger
@@ -43,8 +50,8 @@ def main():
         'options': {
             'defaultType': 'spot',
         },
-        'rateLimit': 200, # Уменьшаем задержку для более частых запросов
-        'enableRateLimit': True,
+        # Встроенный ограничитель запросов ccxt выключен
+        'enableRateLimit': False,
     })
 
     # Проверка доступности API
@@ -66,18 +73,21 @@ def main():
         exchange_name='Huobi' # <-- Указываем имя для логов
     )
 
-    logging.info(f"Starting bot in '{BOT_MODE}' mode.")
-    logging.info(f"Symbols: {SYMBOLS}")
-    logging.info(f"Position size: ${POSITION_SIZE} USDT")
-    logging.info(f"Minimum profit threshold: {MIN_PROFIT_THRESHOLD}%")
+    logging.info(
+        f"Starting bot in '{BOT_MODE}' mode.\n"
+        f"  Symbols: {SYMBOLS}\n"
+        f"  Position size: ${POSITION_SIZE} USDT\n"
+        f"  Minimum profit threshold: {MIN_PROFIT_THRESHOLD}%"
+    )
+
+    # Количество сетевых ошибок подряд - для экспоненциальной паузы между повторами
+    network_errors = 0
 
     try:
         while True:
             try:
-                # Получаем стаканы для всех символов
-                for symbol in SYMBOLS:
-                    order_book = exchange.fetch_order_book(symbol, limit=20) # limit=20 - глубина стакана
-                    strategy.update_market_data(symbol, order_book)
+                # Получаем стаканы для всех символов (параллельно)
+                strategy.fetch_order_books(limit=20) # limit=20 - глубина стакана
                 
                 # Рассчитываем арбитраж на основе полных стаканов
                 profit_percentage = strategy.calculate_arbitrage()
@@ -87,19 +97,24 @@ def main():
                 print(f"Current market divergence: {profit_percentage:+.4f}%   ", end="\r")
 
                 # Логируем и симулируем только те возможности, которые превышают наш порог
-                if profit_percentage > MIN_PROFIT_THRESHOLD:
-                    logging.info(f"Found potential arbitrage opportunity (before fees): {profit_percentage:.4f}%")
+                # Повторное появление той же возможности в следующих циклах не считаем
+                if profit_percentage > MIN_PROFIT_THRESHOLD and strategy.is_new_opportunity():
+                    logging.info("Found potential arbitrage opportunity (before fees): %.4f%%", profit_percentage)
                     
                     # Если режим paper_trader, логируем сделку через стратегию
                     if BOT_MODE == 'paper_trader':
                         strategy.log_paper_trade(profit_percentage)
 
                 # Собираем статистику по всем расхождениям с временными метками
-                strategy.divergence_data.append((datetime.now(), profit_percentage))
+                strategy.divergence_data.append((time.time(), profit_percentage))
+                network_errors = 0
 
             except ccxt.NetworkError as e:
-                logging.warning(f"Network error: {e}. Retrying...")
-                time.sleep(5)
+                # Не долбим зависшую биржу: пауза растет 5, 10, 20... сек до MAX_NETWORK_RETRY_DELAY
+                delay = min(NETWORK_RETRY_DELAY * 2 ** network_errors, MAX_NETWORK_RETRY_DELAY)
+                network_errors += 1
+                logging.warning(f"Network error: {e}. Retrying in {delay}s...")
+                time.sleep(delay)
             except ccxt.ExchangeError as e:
                 logging.error(f"Exchange error: {e}. Check API keys or symbol names.")
                 time.sleep(20)
@@ -111,6 +126,7 @@ def main():
 
     except KeyboardInterrupt:
         logging.info("Shutdown signal received. Saving data...")
+        strategy.close()
         strategy.save_divergence_data()
         logging.info("Data saved. Exiting.")
 
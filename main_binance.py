@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 import ccxt
 import logging
+import logging.handlers
+import queue
+import atexit
 import time
 import signal
 import threading
@@ -32,7 +35,13 @@ def setup_loggers():
         log_filename = f"res_binance/trades_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
         file_handler = logging.FileHandler(log_filename)
         file_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
-        trade_logger.addHandler(file_handler)
+
+        # Запись на диск идет в отдельном потоке, чтобы цикл опроса не ждал файловый ввод-вывод
+        log_queue = queue.Queue()
+        trade_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(log_queue, file_handler)
+        listener.start()
+        atexit.register(listener.stop) # Дописывает очередь в файл при выходе
         trade_logger.setLevel(logging.INFO)
         logging.info(f"Trade results will be saved to {log_filename}")
 
@@ -78,23 +87,26 @@ def main():
 
 
 
+    # Настройки, которые нужны на каждой итерации, читаем из config один раз
+    min_profit_threshold = config.MIN_PROFIT_THRESHOLD
+    paper_trading = config.BOT_MODE == 'paper_trader'
+    collector_interval = config.COLLECTOR_INTERVAL
+
+    # Количество сетевых ошибок подряд - для экспоненциальной паузы между повторами
+    network_errors = 0
+
     # --- Main Bot Loop ---
     while not shutdown_flag.is_set():
         try:
-            # 1. Fetch order books for all required symbols
-            all_books_fetched = True
-            for symbol in strategy.symbols:
-                try:
-                    order_book = exchange.fetch_order_book(symbol, limit=5)
-                    strategy.update_market_data(symbol, order_book)
-                except Exception as e:
-                    logging.warning(f"Could not fetch order book for {symbol}: {e}")
-                    all_books_fetched = False
-                    break # Don't calculate if one symbol fails
-            
-            if not all_books_fetched:
-                time.sleep(config.COLLECTOR_INTERVAL)
-                continue
+            # 1. Fetch order books for all required symbols (concurrently)
+            try:
+                strategy.fetch_order_books(limit=5)
+            except ccxt.NetworkError:
+                raise # Обрабатывается ниже с экспоненциальной паузой
+            except Exception as e:
+                logging.warning("Could not fetch order books: %s", e)
+                time.sleep(collector_interval)
+                continue # Don't calculate if one symbol fails
 
             # 2. Calculate arbitrage based on the new data
             profit_percentage = strategy.calculate_arbitrage()
@@ -102,29 +114,36 @@ def main():
             # 3. Process the result
             if profit_percentage is not None:
                 print(f"\rCurrent Binance market divergence: {profit_percentage:+.4f}%", end="", flush=True)
-                strategy.divergence_data.append((datetime.now(), profit_percentage))
+                strategy.divergence_data.append((time.time(), profit_percentage))
 
-                if profit_percentage > config.MIN_PROFIT_THRESHOLD:
-                    logging.info(f"\n---> Found profitable opportunity on Binance: {profit_percentage:+.4f}% <---")
+                # Повторное появление той же возможности в следующих циклах не считаем
+                if profit_percentage > min_profit_threshold and strategy.is_new_opportunity():
+                    logging.info("\n---> Found profitable opportunity on Binance: %+.4f%% <---", profit_percentage)
                     
-                    if config.BOT_MODE == 'paper_trader':
+                    if paper_trading:
                         # Вся логика симуляции и логирования теперь внутри стратегии
                         strategy.log_paper_trade(profit_percentage)
 
+            network_errors = 0
+
         except ccxt.NetworkError as e:
-            logging.warning(f"\nNetwork error: {e}. Retrying...")
-            time.sleep(5)
+            # Не долбим зависшую биржу: пауза растет 5, 10, 20... сек до MAX_NETWORK_RETRY_DELAY
+            delay = min(config.NETWORK_RETRY_DELAY * 2 ** network_errors, config.MAX_NETWORK_RETRY_DELAY)
+            network_errors += 1
+            logging.warning("\nNetwork error: %s. Retrying in %ss...", e, delay)
+            time.sleep(delay)
         except ccxt.ExchangeError as e:
-            logging.error(f"\nExchange error: {e}. Check API keys or symbol names.")
+            logging.error("\nExchange error: %s. Check API keys or symbol names.", e)
             time.sleep(20)
         except Exception as e:
-            logging.error(f"\nUnexpected error: {e}")
+            logging.error("\nUnexpected error: %s", e)
             time.sleep(10)
         
-        time.sleep(config.COLLECTOR_INTERVAL)
+        time.sleep(collector_interval)
 
     # Сохранение данных после завершения
     logging.info("\nBot is shutting down. Saving collected data...")
+    strategy.close()
     strategy.save_divergence_data()
     logging.info("Data saved successfully. Goodbye!")
 
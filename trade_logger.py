@@ -6,10 +6,10 @@ from config import POSITION_SIZE
 class TradeLogger:
     def __init__(self, log_dir="res"):
         self.log_dir = log_dir
-        if not os.path.exists(self.log_dir):
-            os.makedirs(self.log_dir)
+        os.makedirs(self.log_dir, exist_ok=True)
         
         self.log_file_path = self._get_log_file_path()
+        self._log_file = None # Файл открывается один раз и держится до log_end
         self.start_time = None
         self.initial_balance = POSITION_SIZE
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -27,12 +27,21 @@ class TradeLogger:
             i += 1
         return os.path.join(self.log_dir, f"{base_name}{i}.txt")
 
+    def _write(self, text: str):
+        """Дописывает текст в лог сессии через открытый файл, без open() на каждую запись."""
+        if self._log_file is None:
+            self._log_file = open(self.log_file_path, 'a', encoding='utf-8')
+        self._log_file.write(text)
+        self._log_file.flush()
+
     def log_start(self):
         self.start_time = datetime.datetime.now()
         log_entry = f"Сессия началась: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}\nНачальный баланс: {self.initial_balance:.2f} USDT\n" + "-" * 80 + "\n"
         
-        with open(self.log_file_path, 'w', encoding='utf-8') as f:
-            f.write(log_entry)
+        if self._log_file is not None:
+            self._log_file.close()
+        self._log_file = open(self.log_file_path, 'w', encoding='utf-8')
+        self._write(log_entry)
         print(log_entry)
 
     def log_trade(self, trade_number: int, path: str, net_profit_usd: float, status: str, total_fee: float, new_balance: float):
@@ -62,8 +71,7 @@ class TradeLogger:
 
         )
 
-        with open(self.log_file_path, 'a', encoding='utf-8') as f:
-            f.write(file_log)
+        self._write(file_log)
         
         print(console_log)
 
@@ -98,7 +106,8 @@ class TradeLogger:
             f"Общая чистая прибыль: {color}{sign}{total_net_profit:.4f} USDT{self.RESET}\n"
         )
 
-        with open(self.log_file_path, 'a', encoding='utf-8') as f:
-            f.write(log_entry)
+        self._write(log_entry)
+        self._log_file.close()
+        self._log_file = None
         
         print(console_log)